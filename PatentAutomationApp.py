@@ -5,14 +5,46 @@ import logging
 import json
 from docx import Document
 import re
+import tempfile
 
 # ========== SETTINGS MANAGEMENT FUNCTIONS ==========
+def default_file_mode():
+    """Permissions a plain open() would give a new file under the current umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def write_csv_atomic(df, path, **kwargs):
+    """Write df to a unique temp file and swap it in so readers never see a partial CSV"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            df.to_csv(f, **kwargs)
+        # mkstemp creates 0600 files; keep the target's existing permissions instead
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = default_file_mode()
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def read_default_headers(path, mtime):
+    """Parse the headers file once per (path, mtime); editing the file invalidates the entry"""
+    return pd.read_csv(path)['header'].tolist()
+
 def load_default_headers():
     default_headers = ["Title", "Inventors", "Abstract", "Claims", "Description"]
     try:
         if not os.path.exists(DEFAULT_HEADERS_FILE):
-            pd.DataFrame({'header': default_headers}).to_csv(DEFAULT_HEADERS_FILE, index=False)
-        return pd.read_csv(DEFAULT_HEADERS_FILE)['header'].tolist()
+            write_csv_atomic(pd.DataFrame({'header': default_headers}), DEFAULT_HEADERS_FILE, index=False)
+        return read_default_headers(DEFAULT_HEADERS_FILE, os.path.getmtime(DEFAULT_HEADERS_FILE))
     except Exception as e:
         logging.error(f"Header load error: {e}")
         return default_headers
@@ -21,24 +53,29 @@ def load_column_settings():
     try:
         if os.path.exists(COLUMN_SETTINGS_FILE):
             df = pd.read_csv(COLUMN_SETTINGS_FILE, index_col=0)
-            return {**{h: True for h in load_default_headers()}, **df['selected'].to_dict()}
-        return {h: True for h in load_default_headers()}
+            return {**dict.fromkeys(load_default_headers(), True), **df['selected'].to_dict()}
+        return dict.fromkeys(load_default_headers(), True)
     except Exception as e:
         logging.error(f"Column load error: {e}")
-        return {h: True for h in load_default_headers()}
+        return dict.fromkeys(load_default_headers(), True)
 
 def save_column_settings(settings):
     try:
         existing = pd.read_csv(COLUMN_SETTINGS_FILE, index_col=0) if os.path.exists(COLUMN_SETTINGS_FILE) else pd.DataFrame()
         updated = {**existing.to_dict().get('selected', {}), **settings}
-        pd.DataFrame({'selected': updated}).to_csv(COLUMN_SETTINGS_FILE)
+        write_csv_atomic(pd.DataFrame({'selected': updated}), COLUMN_SETTINGS_FILE)
     except Exception as e:
         logging.error(f"Column save error: {e}")
 
+@st.cache_data(max_entries=4, show_spinner=False)
+def read_filter_settings(path, mtime):
+    """Parse the filter settings file once per (path, mtime); saving the file invalidates the entry"""
+    return pd.read_csv(path, index_col=0).to_dict(orient='index')
+
 def load_filter_settings():
     try:
         if os.path.exists(FILTER_SETTINGS_FILE):
-            return pd.read_csv(FILTER_SETTINGS_FILE, index_col=0).to_dict(orient='index')
+            return read_filter_settings(FILTER_SETTINGS_FILE, os.path.getmtime(FILTER_SETTINGS_FILE))
         return {}
     except Exception as e:
         logging.error(f"Filter load error: {e}")
@@ -48,15 +85,21 @@ def save_filter_settings(filters):
     try:
         existing = pd.read_csv(FILTER_SETTINGS_FILE, index_col=0) if os.path.exists(FILTER_SETTINGS_FILE) else pd.DataFrame()
         updated = {**existing.to_dict(orient='index'), **filters}
-        pd.DataFrame.from_dict(updated, orient='index').to_csv(FILTER_SETTINGS_FILE)
+        write_csv_atomic(pd.DataFrame.from_dict(updated, orient='index'), FILTER_SETTINGS_FILE)
     except Exception as e:
         logging.error(f"Filter save error: {e}")
 
+def save_session_settings():
+    save_column_settings(st.session_state.column_settings)
+    save_filter_settings(st.session_state.filter_settings)
+
 def save_user_defaults(data):
     try:
-        pd.DataFrame.from_dict(data, orient='index', columns=['value']).to_csv(USER_DEFAULTS_FILE)
+        write_csv_atomic(pd.DataFrame.from_dict(data, orient='index', columns=['value']), USER_DEFAULTS_FILE)
+        return True
     except Exception as e:
         logging.error(f"User defaults save error: {e}")
+        return False
 
 # ========== PANEL RENDERING ==========
 def render_settings_panel(panel_id):
@@ -69,7 +112,8 @@ def render_settings_panel(panel_id):
         filter_updates = {}
 
         for i, header in enumerate(config["headers"]()):
-            sanitized_key = header.replace('/', '_').replace(' ', '_').replace('&', '_')
+            sanitized_key = WIDGET_KEY_PATTERN.sub('_', header)
+            saved_filter = st.session_state.filter_settings.get(header, {})
             col1, col2, col3 = st.columns([1.2, 1, 2])
 
             # Add column headers only once
@@ -90,8 +134,8 @@ def render_settings_panel(panel_id):
             with col2:
                 condition = st.selectbox(
                     "Condition",  # Hidden label
-                    options=["--", "IS", "BLANK", "CONTAINS", "STARTS WITH", "ENDS WITH"],
-                    index=0,
+                    options=FILTER_CONDITIONS,
+                    index=FILTER_CONDITION_INDEX.get(saved_filter.get('condition'), 0),
                     key=f"{panel_id}_cond_{sanitized_key}",
                     label_visibility="collapsed"
                 )
@@ -99,7 +143,7 @@ def render_settings_panel(panel_id):
             with col3:
                 value = st.text_input(
                     "Value",  # Hidden label
-                    value=st.session_state.filter_settings.get(header, {}).get('value', ""),
+                    value=saved_filter.get('value', ""),
                     key=f"{panel_id}_val_{sanitized_key}",
                     label_visibility="collapsed"
                 )
@@ -110,33 +154,41 @@ def render_settings_panel(panel_id):
 
 # ========== CORE FUNCTIONALITY CLASSES ==========
 class PatentProcessor:
+    # Compiled once at class creation and shared by every instance
+    INVENTORS_PATTERN = re.compile(r"(?:Inventor(?:s)?):\s*(.+?)(?:\n|<span)", re.IGNORECASE|re.MULTILINE)
+    TITLE_PATTERN = re.compile(r"(?:Title):\s*(.+?)(?:\n|<span)", re.IGNORECASE|re.MULTILINE)
+    ABSTRACT_PATTERN = re.compile(r"(?:Abstract):\s*(.+?)(?:\n(?:Claims:|Description:))", re.IGNORECASE|re.MULTILINE|re.DOTALL)
+    CLAIMS_PATTERN = re.compile(r"Claims:(.+?)(?:\nDescription:)", re.IGNORECASE|re.MULTILINE|re.DOTALL)
+    CLAIM_SPLIT_PATTERN = re.compile(r"\n*\d+\.\s*|\n*and\s*\d+\.\s*")
+    DESCRIPTION_PATTERN = re.compile(r"Description:(.+)", re.IGNORECASE|re.MULTILINE|re.DOTALL)
+
     def __init__(self, text):
         self.text = text
 
     def clean_text(self, text):
-        return ' '.join(text.split()).strip()
+        return ' '.join(text.split())
 
     def extract_inventors(self):
-        match = re.search(r"(?:Inventor(?:s)?):\s*(.+?)(?:\n|<span)", self.text, re.IGNORECASE|re.MULTILINE)
-        return [self.clean_text(n.strip()) for n in match.group(1).split(',')] if match else []
+        match = self.INVENTORS_PATTERN.search(self.text)
+        return [self.clean_text(n) for n in match.group(1).split(',')] if match else []
 
     def extract_title(self):
-        match = re.search(r"(?:Title):\s*(.+?)(?:\n|<span)", self.text, re.IGNORECASE|re.MULTILINE)
+        match = self.TITLE_PATTERN.search(self.text)
         return self.clean_text(match.group(1)) if match else "No Title Found"
 
     def extract_abstract(self):
-        match = re.search(r"(?:Abstract):\s*(.+?)(?:\n(?:Claims:|Description:))", self.text, re.IGNORECASE|re.MULTILINE|re.DOTALL)
+        match = self.ABSTRACT_PATTERN.search(self.text)
         return self.clean_text(match.group(1)) if match else "No Abstract Found"
 
     def extract_claims(self):
-        match = re.search(r"Claims:(.+?)(?:\nDescription:)", self.text, re.IGNORECASE|re.MULTILINE|re.DOTALL)
+        match = self.CLAIMS_PATTERN.search(self.text)
         if match:
-            claims = re.split(r"\n*\d+\.\s*|\n*and\s*\d+\.\s*", match.group(1).strip())
+            claims = self.CLAIM_SPLIT_PATTERN.split(match.group(1).strip())
             return [self.clean_text(c) for c in claims if c.strip()]
         return []
 
     def extract_description(self):
-        match = re.search(r"Description:(.+)", self.text, re.IGNORECASE|re.MULTILINE|re.DOTALL)
+        match = self.DESCRIPTION_PATTERN.search(self.text)
         return match.group(1).strip() if match else "No Description Found"
 
     def analyze(self):
@@ -155,6 +207,12 @@ FILTER_SETTINGS_FILE = os.path.join(CONFIG_FOLDER, "patent_filter_settings.csv")
 DEFAULT_HEADERS_FILE = os.path.join(CONFIG_FOLDER, "patent_headers_default.csv")
 USER_DEFAULTS_FILE = os.path.join(CONFIG_FOLDER, "patent_user_default.csv")
 
+FILTER_CONDITIONS = ["--", "IS", "BLANK", "CONTAINS", "STARTS WITH", "ENDS WITH"]
+FILTER_CONDITION_INDEX = {condition: i for i, condition in enumerate(FILTER_CONDITIONS)}
+
+# Normalise '/', ' ' and '&' in headers to '_' for widget keys in one pass
+WIDGET_KEY_PATTERN = re.compile(r"[/ &]")
+
 PANEL_CONFIG = {
     "main": {
         "label": "📋 Main Settings",
@@ -199,8 +257,10 @@ def main():
             app_nums = st.text_area("Application Numbers", height=100,
                                   help="Enter application numbers (one per line or comma-separated)")
 
-        # Save inputs immediately
-        save_user_defaults({"emails": emails, "application_numbers": app_nums})
+        # Save inputs immediately, but only rewrite the file when they actually change
+        user_defaults = {"emails": emails, "application_numbers": app_nums}
+        if st.session_state.get('saved_user_defaults') != user_defaults and save_user_defaults(user_defaults):
+            st.session_state.saved_user_defaults = user_defaults
 
     # ========== TABBED PANELS SECTION ==========
     with st.container():
@@ -226,15 +286,13 @@ def main():
             if st.button("💾 Save Settings", type="primary", use_container_width=True):
                 st.session_state.column_settings.update(panel_updates)
                 st.session_state.filter_settings.update(filter_updates)
-                save_column_settings(st.session_state.column_settings)
-                save_filter_settings(st.session_state.filter_settings)
+                save_session_settings()
                 st.toast("Settings saved successfully!", icon="✅")
 
             if st.button("🔄 Reset to Defaults", type="secondary", use_container_width=True):
-                st.session_state.column_settings = {h: True for h in load_default_headers()}
+                st.session_state.column_settings = dict.fromkeys(load_default_headers(), True)
                 st.session_state.filter_settings = {}
-                save_column_settings(st.session_state.column_settings)
-                save_filter_settings(st.session_state.filter_settings)
+                save_session_settings()
                 st.rerun()
 
 if __name__ == "__main__":